@@ -12,20 +12,35 @@ import name
 import deserialize
 
 
+# Operations that need an existing body to act on
+BODY_OPERATIONS = (
+    adsk.fusion.FeatureOperations.CutFeatureOperation,
+    adsk.fusion.FeatureOperations.IntersectFeatureOperation
+)
+# Extrudes are always made in the direction of the end face
+POSITIVE_EXTENT_DIRECTION = adsk.fusion.ExtentDirections.PositiveExtentDirection
+# Resolve the extent definition constructor once
+create_to_entity_extent = adsk.fusion.ToEntityExtentDefinition.create
+# Entity types that can be identified by tempId
+TEMP_ID_TYPES = (adsk.fusion.BRepFace, adsk.fusion.BRepEdge)
+
+
 class FaceReconstructor():
 
     def __init__(self, target, reconstruction, use_temp_id=True):
         self.target = target
-        self.reconstruction = reconstruction
+        self.set_reconstruction_component(reconstruction)
         self.use_temp_id = use_temp_id
         self.app = adsk.core.Application.get()
         self.design = adsk.fusion.Design.cast(self.app.activeProduct)
-        # Populate the cache with a map from uuids to face indices
+        # Populate the cache with a map from uuids to face entity tokens
         self.target_uuid_to_face_map = self.get_target_uuid_to_face_map()
 
     def set_reconstruction_component(self, reconstruction):
         """Set the reconstruction component"""
         self.reconstruction = reconstruction
+        # Extrudes are always added to the reconstruction component
+        self.extrudes = reconstruction.component.features.extrudeFeatures
 
     def reconstruct(self, graph_data):
         """Reconstruct from the sequence of faces"""
@@ -39,34 +54,26 @@ class FaceReconstructor():
 
     def get_face_from_uuid(self, face_uuid):
         """Get a face from an index in the sequence"""
-        if face_uuid not in self.target_uuid_to_face_map:
-            return None
-        uuid_data = self.target_uuid_to_face_map[face_uuid]
         # We get the face by following the entity token
-        face_token = uuid_data["face_token"]
+        face_token = self.target_uuid_to_face_map.get(face_uuid)
+        if face_token is None:
+            return None
         entities = self.design.findEntityByToken(face_token)
         if entities is None:
             return None
         return entities[0]
-        # body_index = uuid_data["body_index"]
-        # face_index = uuid_data["face_index"]
-        # body = self.target.bRepBodies[body_index]
-        # face = body.faces[face_index]
-        # return face
 
     def get_target_uuid_to_face_map(self):
         """As we have to find faces multiple times we first
-            make a map between uuids and face indices"""
+            make a map between uuids and face entity tokens"""
         target_uuid_to_face_map = {}
-        for body_index, body in enumerate(self.target.bRepBodies):
-            for face_index, face in enumerate(body.faces):
-                face_uuid = self.get_regraph_uuid(face)
+        get_regraph_uuid = self.get_regraph_uuid
+        # Take a single pass over each Fusion collection
+        for body in list(self.target.bRepBodies):
+            for face in list(body.faces):
+                face_uuid = get_regraph_uuid(face)
                 assert face_uuid is not None
-                target_uuid_to_face_map[face_uuid] = {
-                    "body_index": body_index,
-                    "face_index": face_index,
-                    "face_token": face.entityToken
-                }
+                target_uuid_to_face_map[face_uuid] = face.entityToken
         return target_uuid_to_face_map
 
     def add_extrude_from_uuid(self, start_face_uuid, end_face_uuid, operation):
@@ -80,29 +87,24 @@ class FaceReconstructor():
 
     def add_extrude(self, start_face, end_face, operation):
         """Create an extrude from a start face to an end face"""
+        reconstruction_bodies = self.reconstruction.bRepBodies
         # If there are no bodies to cut or intersect, do nothing
-        if ((operation == adsk.fusion.FeatureOperations.CutFeatureOperation or
-           operation == adsk.fusion.FeatureOperations.IntersectFeatureOperation) and
-           self.reconstruction.bRepBodies.count == 0):
+        if (operation in BODY_OPERATIONS and
+           reconstruction_bodies.count == 0):
             return None
         # We generate the extrude bodies in the reconstruction component
-        extrudes = self.reconstruction.component.features.extrudeFeatures
+        extrudes = self.extrudes
         extrude_input = extrudes.createInput(start_face, operation)
-        extent = adsk.fusion.ToEntityExtentDefinition.create(end_face, False)
-        extrude_input.setOneSideExtent(extent, adsk.fusion.ExtentDirections.PositiveExtentDirection)
+        extent = create_to_entity_extent(end_face, False)
+        extrude_input.setOneSideExtent(extent, POSITIVE_EXTENT_DIRECTION)
         extrude_input.creationOccurrence = self.reconstruction
-        tools = []
-        for body in self.reconstruction.bRepBodies:
-            tools.append(body)
-        extrude_input.participantBodies = tools
+        extrude_input.participantBodies = list(reconstruction_bodies)
         extrude = extrudes.add(extrude_input)
         return extrude
 
     def get_regraph_uuid(self, entity):
         """Get a uuid or a tempid depending on a flag"""
-        is_face = isinstance(entity, adsk.fusion.BRepFace)
-        is_edge = isinstance(entity, adsk.fusion.BRepEdge)
-        if self.use_temp_id and (is_face or is_edge):
+        if self.use_temp_id and isinstance(entity, TEMP_ID_TYPES):
             return str(entity.tempId)
         else:
             return name.get_uuid(entity)
@@ -227,18 +227,13 @@ def get_intersect_volume(bodies_one, bodies_two):
     design = adsk.fusion.Design.cast(app.activeProduct)
 
     # Store which bodies are in each list
+    # while creating a collection of all bodies
     bodies_group = {}
-    for body in bodies_one:
-        bodies_group[body.revisionId] = 1
-    for body in bodies_two:
-        bodies_group[body.revisionId] = 2
-
-    # Create a collection of all bodies
     bodies = adsk.core.ObjectCollection.create()
-    for body in bodies_one:
-        bodies.add(body)
-    for body in bodies_two:
-        bodies.add(body)
+    for group, group_bodies in ((1, bodies_one), (2, bodies_two)):
+        for body in group_bodies:
+            bodies_group[body.revisionId] = group
+            bodies.add(body)
 
     # Analyze interference
     input = design.createInterferenceInput(bodies)
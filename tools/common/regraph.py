@@ -12,11 +12,13 @@ import json
 import os
 import sys
 import time
-import copy
 from pathlib import Path
 import importlib
 import unittest
 import math
+import itertools
+import operator
+from collections import namedtuple
 
 import name
 import geometry
@@ -25,10 +27,42 @@ import serialize
 import exceptions
 import face_reconstructor
 importlib.reload(face_reconstructor)
-from face_reconstructor import FaceReconstructor
+from face_reconstructor import FaceReconstructor, TEMP_ID_TYPES
 from logger import Logger
 
 
+# Number of UV-Net style samples along an edge and across a face
+EDGE_SAMPLES = 10
+FACE_SAMPLES = 10
+# Number of steps the parametric range is divided into and the step indices sampled
+# Edges include both end points, faces only use interior samples
+EDGE_PARAM_STEPS = EDGE_SAMPLES - 1
+EDGE_PARAM_INDICES = range(EDGE_SAMPLES)
+FACE_PARAM_STEPS = FACE_SAMPLES + 1
+FACE_PARAM_INDICES = range(1, FACE_SAMPLES + 1)
+# Labels cached for each face created by an extrude
+FaceLabels = namedtuple("FaceLabels", [
+    "location_in_feature_label",
+    "timeline_index_label",
+    "operation_label"
+])
+# Extrude operations that are valid in a per face sequence
+VALID_EXTRUDE_OPERATIONS = frozenset([
+    "JoinFeatureOperation",
+    "CutFeatureOperation",
+    "IntersectFeatureOperation",
+    "NewBodyFeatureOperation"
+])
+# Get the x, y, z coordinates of a point or vector as a tuple
+get_xyz = operator.attrgetter("x", "y", "z")
+# Point containment values that are kept by the trimming mask
+# everything else, i.e. outside or unknown, is masked out
+TRIMMING_MASK_CONTAINMENT = {
+    adsk.fusion.PointContainment.PointInsidePointContainment: 1,
+    adsk.fusion.PointContainment.PointOnPointContainment: 1
+}
+
+
 class Regraph():
     """Reconstruction Graph generation"""
 
@@ -46,6 +80,14 @@ class Regraph():
 
         # The mode we want
         self.mode = mode
+        # Resolve the mode once, rather than for every face and edge
+        self.is_per_extrude = mode == "PerExtrude"
+        if self.is_per_extrude:
+            self.face_data_fn = self.get_face_data_per_extrude
+            self.edge_data_fn = self.get_edge_data_per_extrude
+        else:
+            self.face_data_fn = self.get_face_data_per_face
+            self.edge_data_fn = self.get_edge_data_per_face
         # Global flag defining which id's to get for regraph
         self.use_temp_id = use_temp_id
         # Include labels when we output the graph
@@ -61,13 +103,30 @@ class Regraph():
         self.face_cache = {}
         # Cache of the edge information
         self.edge_cache = {}
+        # Cache of the face normals for the body being processed
+        self.face_normal_cache = {}
+        # Cache of face pair checks for the body being processed
+        # keyed on the sorted face uuids of the pair
+        self.face_pair_tangent_cache = {}
+        self.face_pair_perpendicular_cache = {}
+        # Cache of the faces and edges of each body revision
+        # and their uuids keyed on tempId, only kept until the
+        # next edge cache update or timeline marker move
+        self.body_entity_cache = {}
+        # Cache of the graph nodes and links of each body revision
+        # so bodies unchanged by an extrude are not walked again
+        self.body_graph_cache = {}
+        # Cache of face sample Point2D lists keyed on the
+        # parametric range, as many faces share the same range
+        self.face_param_cache = {}
+        # Functions to find the offset from the sketch plane
+        # for each type of extrude start extent
+        self.start_extent_offset_fns = {
+            adsk.fusion.ProfilePlaneStartDefinition: lambda start_extent: 0,
+            adsk.fusion.OffsetStartDefinition: self.get_offset_start_extent_offset
+        }
         # The sequence of nodes and edges that become explained
         self.sequence = []
-        # The cache of the faces and edges seen so far
-        self.sequence_cache = {
-            "faces": set(),
-            "edges": set()
-        }
         # Current extrude index
         self.current_extrude_index = 0
         # Current overall action index
@@ -80,6 +139,7 @@ class Regraph():
     def generate(self):
         """Generate graphs from the design in the timeline"""
         assert self.reconstruction.bRepBodies.count > 0
+        self.body_graph_cache = {}
         # We (likely) need to first populate the face cache first
         self.add_faces_to_cache()
         # Check that all faces have uuids
@@ -128,8 +188,10 @@ class Regraph():
                     raise exceptions.UnsupportedException(
                             "Multiple face extrude to single body")
                 for body in bodies:
+                    # The previous graph is not modified by the delta
+                    # so it can be shared rather than copied
                     if len(self.data["graphs"]) > 0:
-                        prev_graph = copy.deepcopy(self.data["graphs"][-1])
+                        prev_graph = self.data["graphs"][-1]
                     else:
                         prev_graph = None
                     graph = self.get_graph_delta(prev_graph, body)
@@ -185,26 +247,27 @@ class Regraph():
     def add_extrude_to_cache(self, extrude, timeline_index):
         """Add the data from the latest extrude to the cache"""
         operation = serialize.feature_operation(extrude.operation)
-        self.add_extrude_faces_to_cache(extrude.startFaces, operation, "StartFace", timeline_index)
-        self.add_extrude_faces_to_cache(extrude.endFaces, operation, "EndFace", timeline_index)
-        self.add_extrude_faces_to_cache(extrude.sideFaces, operation, "SideFace", timeline_index)
-
-    def add_extrude_faces_to_cache(self, extrude_faces, operation, location_in_feature, timeline_index):
-        """Update the extrude face cache with the recently added faces"""
-        for face in extrude_faces:
-            # We want to set a uuid on the face in the assembly context
-            # of the reconstruction, rather than on the component face
-            proxy_face = face.createForAssemblyContext(self.reconstruction)
-            face_uuid = self.set_regraph_uuid(proxy_face)
-            assert face_uuid is not None
-            # We will have split faces with the same uuid
-            # So we need to update them
-            # assert face_uuid not in self.face_cache
-            self.face_cache[face_uuid] = {
-                "operation_label": operation,
-                "timeline_index_label": timeline_index,
-                "location_in_feature_label": location_in_feature
-            }
+        reconstruction = self.reconstruction
+        extrude_faces = (
+            (extrude.startFaces, "StartFace"),
+            (extrude.endFaces, "EndFace"),
+            (extrude.sideFaces, "SideFace")
+        )
+        for faces, location_in_feature in extrude_faces:
+            for face in faces:
+                # We want to set a uuid on the face in the assembly context
+                # of the reconstruction, rather than on the component face
+                proxy_face = face.createForAssemblyContext(reconstruction)
+                face_uuid = self.set_regraph_uuid(proxy_face)
+                assert face_uuid is not None
+                # We will have split faces with the same uuid
+                # So we need to update them
+                # assert face_uuid not in self.face_cache
+                self.face_cache[face_uuid] = FaceLabels(
+                    location_in_feature_label=location_in_feature,
+                    timeline_index_label=timeline_index,
+                    operation_label=operation
+                )
 
     def add_edges_to_cache(self, bodies=None):
         """Update the edge cache with the latest extrude"""
@@ -215,76 +278,109 @@ class Regraph():
         for body in bodies:
             temp_ids = name.get_temp_ids_from_collection(body.concaveEdges)
             concave_edge_cache.update(temp_ids)
+        get_face_uuid_from_map = self.get_face_uuid_from_map
+        is_per_extrude = self.is_per_extrude
+        self.body_entity_cache = {}
         for body in bodies:
-            for face in body.faces:
-                for edge in face.edges:
-                    edge_faces = edge.faces
-                    assert edge_faces.count == 2
-                    edge_uuid = self.set_regraph_uuid(edge)
-                    edge_temp_id = edge.tempId
-                    edge_concave = edge_temp_id in concave_edge_cache
-                    assert edge_uuid is not None
-                    self.edge_cache[edge_uuid] = {
-                        "temp_id": edge_temp_id,
-                        "source": self.get_regraph_uuid(edge_faces[0]),
-                        "target": self.get_regraph_uuid(edge_faces[1])
-                    }
-                    if self.mode == "PerExtrude":
-                        self.edge_cache[edge_uuid]["convexity"] = self.get_edge_convexity(edge, edge_concave)
-                    # TODO: Handle cases where an edge has more than 2 faces
-                    # We have to connect each face to one another
-                    # but currently we cache 1 graph edge for each brep edge
-                    # we need to have a way to store multiple graph edges per brep edge...
-                    # for edge_face_index, edge_face in enumerate(edge.faces):
-                    #     for index in range(edge_face_index + 1, edge.faces.count):
-                    #         print(edge_face_index, index)
-                    #         self.edge_cache[edge_uuid] = {
-                    #             "temp_id": edge.tempId,
-                    #             "convexity": self.get_edge_convexity(edge, edge_concave),
-                    #             "source": self.get_regraph_uuid(edge.faces[edge_face_index]),
-                    #             "target": self.get_regraph_uuid(edge.faces[index])
-                    #         }
+            # Fetch the faces and edges of the body once
+            # so they can be reused when building the graph
+            faces = list(body.faces)
+            edges = list(body.edges)
+            # Look up each face uuid once per body, rather than
+            # for every edge that references the face
+            # tempIds are only valid while the body is unchanged
+            # so this map can't be kept between extrudes
+            face_uuids = {}
+            for face in faces:
+                face_uuids[face.tempId] = self.get_regraph_uuid(face)
+            edge_uuids = {}
+            self.body_entity_cache[body.revisionId] = (faces, edges, face_uuids, edge_uuids)
+            # Faces can share more than one edge, so cache
+            # the tangent check for each pair of faces in this body
+            self.face_pair_tangent_cache = {}
+            # Visit each edge of the body directly, rather than
+            # through the faces, so each edge is only visited once
+            for edge in edges:
+                edge_temp_id = edge.tempId
+                edge_faces = edge.faces
+                assert edge_faces.count == 2
+                source_face = edge_faces[0]
+                target_face = edge_faces[1]
+                edge_uuid = self.set_regraph_uuid(edge)
+                edge_concave = edge_temp_id in concave_edge_cache
+                assert edge_uuid is not None
+                edge_uuids[edge_temp_id] = edge_uuid
+                source_uuid = get_face_uuid_from_map(source_face, face_uuids)
+                target_uuid = get_face_uuid_from_map(target_face, face_uuids)
+                self.edge_cache[edge_uuid] = {
+                    "temp_id": edge_temp_id,
+                    "source": source_uuid,
+                    "target": target_uuid
+                }
+                if is_per_extrude:
+                    face_pair = self.get_face_pair_key(source_uuid, target_uuid)
+                    self.edge_cache[edge_uuid]["convexity"] = self.get_edge_convexity(
+                        source_face, target_face, edge_concave, face_pair)
+                # TODO: Handle cases where an edge has more than 2 faces
+                # We have to connect each face to one another
+                # but currently we cache 1 graph edge for each brep edge
+                # we need to have a way to store multiple graph edges per brep edge...
+                # for edge_face_index, edge_face in enumerate(edge.faces):
+                #     for index in range(edge_face_index + 1, edge.faces.count):
+                #         print(edge_face_index, index)
+                #         self.edge_cache[edge_uuid] = {
+                #             "temp_id": edge.tempId,
+                #             "convexity": self.get_edge_convexity(edge, edge_concave),
+                #             "source": self.get_regraph_uuid(edge.faces[edge_face_index]),
+                #             "target": self.get_regraph_uuid(edge.faces[index])
+                #         }
 
     def add_extrude_to_sequence(self, extrude):
         """Add the extrude operation to the sequence"""
         # Keep track of which bodies from each extrude
         bodies = []
+        operation = serialize.feature_operation(extrude.operation)
+        extrude_start_faces = extrude.startFaces
+        extrude_end_faces = extrude.endFaces
+        start_face_count = extrude_start_faces.count
+        end_face_count = extrude_end_faces.count
         # Multiple start or end faces in a single extrude
-        if extrude.startFaces.count > 1 or extrude.endFaces.count > 1:
-            start_faces = extrude.startFaces
+        if start_face_count > 1 or end_face_count > 1:
+            start_faces = extrude_start_faces
             start_end_flipped = False
-            if extrude.endFaces.count > extrude.startFaces.count:
-                start_faces = extrude.endFaces
+            if end_face_count > start_face_count:
+                start_faces = extrude_end_faces
                 start_end_flipped = True
             for start_face in start_faces:
-                body = self.add_extrude_faces_to_sequence(extrude, start_face, start_end_flipped)
+                body = self.add_extrude_faces_to_sequence(extrude, operation, start_face, start_end_flipped)
                 bodies.append(body)
         # Single extrude
         else:
-            body = self.add_extrude_faces_to_sequence(extrude)
+            body = self.add_extrude_faces_to_sequence(extrude, operation)
             bodies.append(body)
         return bodies
 
-    def add_extrude_faces_to_sequence(self, extrude, start_face=None, start_end_flipped=None):
+    def add_extrude_faces_to_sequence(self, extrude, operation, start_face=None, start_end_flipped=None):
         """Add the extrude operation to the sequence"""
         # If we don't already have a start face
         if start_face is None or start_end_flipped is None:
             start_face, start_end_flipped = self.get_extrude_start_face(extrude)
         assert start_face is not None
+        reconstruction = self.reconstruction
+        start_body = start_face.body
         # Get the face uuid in the context of the occurrence, not the component
-        proxy_start_face = start_face.createForAssemblyContext(self.reconstruction)
+        proxy_start_face = start_face.createForAssemblyContext(reconstruction)
         start_face_uuid = self.get_regraph_uuid(proxy_start_face)
         assert start_face_uuid is not None
 
         # End face
-        end_face = self.get_extrude_end_face(extrude, start_end_flipped, start_face.body)
+        end_face = self.get_extrude_end_face(extrude, start_end_flipped, start_body)
         assert end_face is not None
         # Get the face uuid in the context of the occurrence, not the component
-        proxy_end_face = end_face.createForAssemblyContext(self.reconstruction)
+        proxy_end_face = end_face.createForAssemblyContext(reconstruction)
         end_face_uuid = self.get_regraph_uuid(proxy_end_face)
         assert end_face_uuid is not None
 
-        operation = serialize.feature_operation(extrude.operation)
         # Add the extrude to the sequence
         extrude_to_sequence_entry = {
             "start_face": start_face_uuid,
@@ -292,7 +388,7 @@ class Regraph():
             "operation": operation
         }
         self.sequence.append(extrude_to_sequence_entry)
-        return start_face.body
+        return start_body
 
     def get_extrude_start_face(self, extrude):
         """Get the start face from an extrude, along with a flag to
@@ -300,54 +396,62 @@ class Regraph():
         # Look for a start or end face with a single face
         start_end_flipped = False
         start_end_face_set = False
-        if (extrude.startFaces.count == 1 and
-           extrude.endFaces.count == 1):
+        # The face counts are read again whenever the marker moves
+        start_face_count = extrude.startFaces.count
+        end_face_count = extrude.endFaces.count
+        if start_face_count == 1 and end_face_count == 1:
             # If we have both a start face and an end face
             # we can't tell which face will remain intact so
             # we skip to the end of the design
             # and check it still exists
             prev_timeline_index = self.timeline.markerPosition
+            prev_face_counts = (start_face_count, end_face_count)
             self.timeline.moveToEnd()
+            # Moving the marker recomputes the design, so the
+            # faces, edges and tempIds we hold are no longer valid
+            self.body_entity_cache = {}
+            start_face_count = extrude.startFaces.count
+            end_face_count = extrude.endFaces.count
             # If either start or end is absent
             # assign the other if we can
-            if extrude.startFaces.count == 0:
-                if extrude.endFaces.count > 0:
+            if start_face_count == 0:
+                if end_face_count > 0:
                     start_face = extrude.endFaces[0]
                     start_end_flipped = True
                     start_end_face_set = True
-                self.timeline.markerPosition = prev_timeline_index
-            elif extrude.endFaces.count == 0:
-                if extrude.startFaces.count > 0:
+            elif end_face_count == 0:
+                if start_face_count > 0:
                     start_face = extrude.startFaces[0]
                     start_end_flipped = False
                     start_end_face_set = True
+            # Restoring the marker also restores the counts read there
+            if start_face_count == 0 or end_face_count == 0:
                 self.timeline.markerPosition = prev_timeline_index
+                start_face_count, end_face_count = prev_face_counts
             # If we have both start and end then pick the larger one
             # which has not been trimmed/split
-            if (extrude.startFaces.count > 0 and
-                extrude.endFaces.count > 0):
-                    sf = extrude.startFaces[0]
-                    ef = extrude.endFaces[0]
-                    sf_area = sf.area
-                    ef_area = ef.area
-                    self.timeline.markerPosition = prev_timeline_index
-                    # If both start and end are the same size
-                    # then we want to skip out here
-                    # and let the regular priority order take place
-                    if not math.isclose(sf_area, ef_area, abs_tol=0.01):
-                        if sf_area > ef_area:
-                            start_face = extrude.startFaces[0]
-                            start_end_flipped = False
-                        else:
-                            start_face = extrude.endFaces[0]
-                            start_end_flipped = True
-                        start_end_face_set = True
+            if start_face_count > 0 and end_face_count > 0:
+                sf_area = extrude.startFaces[0].area
+                ef_area = extrude.endFaces[0].area
+                self.timeline.markerPosition = prev_timeline_index
+                start_face_count, end_face_count = prev_face_counts
+                # If both start and end are the same size
+                # then we want to skip out here
+                # and let the regular priority order take place
+                # Note: the faces are fetched again as the marker has moved
+                if abs(sf_area - ef_area) > 0.01:
+                    start_end_flipped = sf_area <= ef_area
+                    if start_end_flipped:
+                        start_face = extrude.endFaces[0]
+                    else:
+                        start_face = extrude.startFaces[0]
+                    start_end_face_set = True
         # If we haven't yet decided, prioritize the start face
         if not start_end_face_set:
-            if extrude.startFaces.count == 1:
+            if start_face_count == 1:
                 start_face = extrude.startFaces[0]
                 start_end_flipped = False
-            elif extrude.endFaces.count == 1:
+            elif end_face_count == 1:
                 start_face = extrude.endFaces[0]
                 start_end_flipped = True
         return start_face, start_end_flipped
@@ -444,49 +548,51 @@ class Regraph():
             return True, None
 
     def is_extrude_tapered(self, extrude):
-        if extrude.extentOne is not None:
-            if isinstance(extrude.extentOne, adsk.fusion.DistanceExtentDefinition):
-                if extrude.taperAngleOne is not None:
-                    if extrude.taperAngleOne.value is not None and extrude.taperAngleOne.value != "":
-                        if extrude.taperAngleOne.value != 0:
-                            return True
+        distance_extent = adsk.fusion.DistanceExtentDefinition
+        if (isinstance(extrude.extentOne, distance_extent) and
+                self.is_taper_angle_set(extrude.taperAngleOne)):
+            return True
         # Check the second extent if needed
         if (extrude.extentType ==
                 adsk.fusion.FeatureExtentTypes.TwoSidesFeatureExtentType):
-            if extrude.extentTwo is not None:
-                if isinstance(extrude.extentTwo, adsk.fusion.DistanceExtentDefinition):
-                    if extrude.taperAngleTwo is not None:
-                        if extrude.taperAngleTwo.value is not None and extrude.taperAngleTwo.value != "":
-                            if extrude.taperAngleTwo.value != 0:
-                                return True
+            if (isinstance(extrude.extentTwo, distance_extent) and
+                    self.is_taper_angle_set(extrude.taperAngleTwo)):
+                return True
         return False
 
+    def is_taper_angle_set(self, taper_angle):
+        """Check if a taper angle parameter has a non-zero value"""
+        # Missing taper angles or values, including empty strings, count as 0
+        taper_value = getattr(taper_angle, "value", 0) or 0
+        return taper_value != 0
+
     # -------------------------------------------------------------------------
     # FEATURES
     # -------------------------------------------------------------------------
 
     def get_face_custom_features(self, face):
         """Custom face features derived from the B-Rep"""
-        face_data = {}
-        face_data["reversed"] = face.isParamReversed
-        # face_data["surface_type_id"] = face.geometry.surfaceType
-        face_data["area"] = face.area
-        normal = geometry.get_face_normal(face)
-        face_data["normal_x"] = normal.x
-        face_data["normal_y"] = normal.y
-        face_data["normal_z"] = normal.z
-        # face_data["normal_length"] = normal.length
-        parameter_result, parameter_at_point = face.evaluator.getParameterAtPoint(face.pointOnFace)
+        normal = self.get_face_normal(face)
+        evaluator = face.evaluator
+        parameter_result, parameter_at_point = evaluator.getParameterAtPoint(face.pointOnFace)
         assert parameter_result
-        curvature_result, max_tangent, max_curvature, min_curvature = face.evaluator.getCurvature(parameter_at_point)
+        curvature_result, max_tangent, max_curvature, min_curvature = evaluator.getCurvature(parameter_at_point)
         assert curvature_result
-        face_data["max_tangent_x"] = max_tangent.x
-        face_data["max_tangent_y"] = max_tangent.y
-        face_data["max_tangent_z"] = max_tangent.z
-        # face_data["max_tangent_length"] = max_tangent.length
-        face_data["max_curvature"] = max_curvature
-        face_data["min_curvature"] = min_curvature
-        return face_data
+        return {
+            "reversed": face.isParamReversed,
+            # "surface_type_id": face.geometry.surfaceType,
+            "area": face.area,
+            "normal_x": normal.x,
+            "normal_y": normal.y,
+            "normal_z": normal.z,
+            # "normal_length": normal.length,
+            "max_tangent_x": max_tangent.x,
+            "max_tangent_y": max_tangent.y,
+            "max_tangent_z": max_tangent.z,
+            # "max_tangent_length": max_tangent.length,
+            "max_curvature": max_curvature,
+            "min_curvature": min_curvature
+        }
 
     def get_edge_custom_features(self, edge, edge_metadata):
         """Custom edge features derived from the B-Rep"""
@@ -496,7 +602,14 @@ class Regraph():
         edge_data["length"] = edge.length
         # Create a feature for the edge convexity
         edge_data["convexity"] = edge_metadata["convexity"]
-        edge_data["perpendicular"] = geometry.are_faces_perpendicular(edge.faces[0], edge.faces[1])
+        face_pair = self.get_face_pair_key(edge_metadata["source"], edge_metadata["target"])
+        perpendicular = self.face_pair_perpendicular_cache.get(face_pair)
+        if perpendicular is None:
+            edge_faces = edge.faces
+            perpendicular = self.are_faces_perpendicular(edge_faces[0], edge_faces[1])
+            if face_pair is not None:
+                self.face_pair_perpendicular_cache[face_pair] = perpendicular
+        edge_data["perpendicular"] = perpendicular
         point_on_edge = edge.pointOnEdge
         evaluator = edge.evaluator
         parameter_result, parameter_at_point = evaluator.getParameterAtPoint(point_on_edge)
@@ -509,87 +622,116 @@ class Regraph():
         edge_data["curvature"] = curvature
         return edge_data
 
-    def get_edge_convexity(self, edge, is_concave):
+    def get_face_normal(self, face):
+        """Get the normal at the center of the face
+            reusing the normal if already calculated for this body"""
+        face_temp_id = face.tempId
+        normal = self.face_normal_cache.get(face_temp_id)
+        if normal is None:
+            normal = geometry.get_face_normal(face)
+            self.face_normal_cache[face_temp_id] = normal
+        return normal
+
+    def are_faces_perpendicular(self, face1, face2):
+        """Check if two faces are perpendicular using the cached normals"""
+        normal1 = self.get_face_normal(face1)
+        normal2 = self.get_face_normal(face2)
+        return normal1.isPerpendicularTo(normal2)
+
+    def get_edge_convexity(self, face1, face2, is_concave, face_pair=None):
+        """Get the convexity of an edge from its two adjacent faces"""
         # is_concave = self.is_concave_edge(edge.tempId)
-        is_tc = geometry.are_faces_tangentially_connected(edge.faces[0], edge.faces[1])
         convexity = "Convex"
         # edge_data["convex"] = self.is_convex_edge(edge.tempId)
         if is_concave:
             convexity = "Concave"
-        elif is_tc:
+        elif self.are_faces_tangentially_connected(face1, face2, face_pair):
             convexity = "Smooth"
         return convexity
 
+    def are_faces_tangentially_connected(self, face1, face2, face_pair=None):
+        """Check if two faces are tangentially connected
+            reusing the result for a face pair already checked in this body"""
+        is_tc = self.face_pair_tangent_cache.get(face_pair)
+        if is_tc is None:
+            is_tc = geometry.are_faces_tangentially_connected(face1, face2)
+            if face_pair is not None:
+                self.face_pair_tangent_cache[face_pair] = is_tc
+        return is_tc
+
+    def get_face_pair_key(self, face1_uuid, face2_uuid):
+        """Get an order independent key for a pair of faces"""
+        if face1_uuid is None or face2_uuid is None:
+            return None
+        if face1_uuid < face2_uuid:
+            return (face1_uuid, face2_uuid)
+        return (face2_uuid, face1_uuid)
+
     def get_trimming_mask(self, pt, body):
         """Return a trimming mask value indicating if a point should be masked or not"""
         containment = body.pointContainment(pt)
-        binary_containment = 1
-        if containment == adsk.fusion.PointContainment.PointOutsidePointContainment:
-            binary_containment = 0
-        elif containment == adsk.fusion.PointContainment.UnknownPointContainment:
-            binary_containment = 0
-        return binary_containment
-
-    def linspace(self, start, stop, n):
-        if n == 1:
-            yield stop
-            return
-        h = (stop - start) / (n - 1)
-        for i in range(n):
-            yield start + h * i
+        return TRIMMING_MASK_CONTAINMENT.get(containment, 0)
+
+    def get_params(self, start, stop, steps, indices):
+        """Get evenly spaced parameters at the given step indices from start to stop"""
+        h = (stop - start) / steps
+        return [start + h * i for i in indices]
 
     def get_edge_parameter_features(self, edge):
         """UV-Net style parameter edge features"""
         param_features = {}
-        samples = 10
         evaluator = edge.evaluator
         result, start_param, end_param = evaluator.getParameterExtents()
         assert result
-        parameters = list(self.linspace(start_param, end_param, samples))
+        parameters = self.get_params(start_param, end_param, EDGE_PARAM_STEPS, EDGE_PARAM_INDICES)
         result, points = evaluator.getPointsAtParameters(parameters)
         assert result
-        param_features["points"] = []
-        for pt in points:
-            param_features["points"].append(pt.x)
-            param_features["points"].append(pt.y)
-            param_features["points"].append(pt.z)
+        param_features["points"] = self.flatten_xyz(points)
         return param_features
 
     def get_face_parameter_features(self, face):
         """UV-Net style parameter face features"""
         param_features = {}
-        samples = 10
         evaluator = face.evaluator
         range_bbox = evaluator.parametricRange()
         u_min = range_bbox.minPoint.x
         u_max = range_bbox.maxPoint.x
         v_min = range_bbox.minPoint.y
         v_max = range_bbox.maxPoint.y
-        u_params = list(self.linspace(u_min, u_max, samples+2))[1:-1]
-        v_params = list(self.linspace(v_min, v_max, samples+2))[1:-1]
-        params = []
-        for u in range(samples):
-            for v in range(samples):
-                pt = adsk.core.Point2D.create(u_params[u], v_params[v])
-                params.append(pt)
+        # Evaluate all the samples on the face with a single
+        # call for points and a single call for normals
+        params = self.get_face_params(u_min, u_max, v_min, v_max)
         result, points = evaluator.getPointsAtParameters(params)
+        assert result
         result, normals = evaluator.getNormalsAtParameters(params)
         assert result
-        param_features["points"] = []
-        param_features["normals"] = []
-        param_features["trimming_mask"] = []
-        for i, pt in enumerate(points):
-            param_features["points"].append(pt.x)
-            param_features["points"].append(pt.y)
-            param_features["points"].append(pt.z)
-            normal = normals[i]
-            param_features["normals"].append(normal.x)
-            param_features["normals"].append(normal.y)
-            param_features["normals"].append(normal.z)
-            trim_mask = self.get_trimming_mask(pt, face.body)
-            param_features["trimming_mask"].append(trim_mask)
+        param_features["points"] = self.flatten_xyz(points)
+        param_features["normals"] = self.flatten_xyz(normals)
+        body = face.body
+        param_features["trimming_mask"] = [
+            self.get_trimming_mask(pt, body) for pt in points
+        ]
         return param_features
 
+    def get_face_params(self, u_min, u_max, v_min, v_max):
+        """Get the grid of Point2D face sample parameters
+            reusing the grid for faces with the same parametric range"""
+        param_range = (u_min, u_max, v_min, v_max)
+        params = self.face_param_cache.get(param_range)
+        if params is None:
+            u_params = self.get_params(u_min, u_max, FACE_PARAM_STEPS, FACE_PARAM_INDICES)
+            v_params = self.get_params(v_min, v_max, FACE_PARAM_STEPS, FACE_PARAM_INDICES)
+            params = list(itertools.starmap(
+                adsk.core.Point2D.create,
+                itertools.product(u_params, v_params)
+            ))
+            self.face_param_cache[param_range] = params
+        return params
+
+    def flatten_xyz(self, entities):
+        """Flatten a list of points or vectors into a list of x, y, z values"""
+        return list(itertools.chain.from_iterable(map(get_xyz, entities)))
+
     # -------------------------------------------------------------------------
     # GRAPH CONSTRUCTION
     # -------------------------------------------------------------------------
@@ -607,60 +749,81 @@ class Regraph():
     def get_graph(self):
         """Get a graph data structure for bodies"""
         graph = self.get_empty_graph()
+        body_graph_cache = {}
         for body in self.reconstruction.bRepBodies:
-            for face in body.faces:
-                if face is not None:
-                    face_data = self.get_face_data(face)
-                    graph["nodes"].append(face_data)
-            for edge in body.edges:
-                if edge is not None:
-                    edge_data = self.get_edge_data(edge)
-                    graph["links"].append(edge_data)
+            # A body keeps its revisionId until it is modified
+            # so the graph data of an unchanged body can be reused
+            revision_id = body.revisionId
+            body_graph_data = self.body_graph_cache.get(revision_id)
+            if body_graph_data is None:
+                body_graph_data = self.get_body_graph_data(body)
+            body_graph_cache[revision_id] = body_graph_data
+            nodes, links = body_graph_data
+            graph["nodes"].extend(nodes)
+            graph["links"].extend(links)
+        # Only keep the bodies in the current design
+        self.body_graph_cache = body_graph_cache
         return graph
 
     def get_graph_delta(self, prev_graph, body):
         """Get a graph data structure as a delta from a previous graph
-            while adding a body from an extrude"""
+            while adding a body from an extrude
+            The node and link data from the previous graph is
+            shared with the new graph, but the previous graph is unchanged"""
         graph = self.get_empty_graph()
+        # The body is the native body of the extrude start face,
+        # not the occurrence body held in the entity cache
+        nodes, links = self.get_body_graph_data(body, use_entity_cache=False)
         if prev_graph is not None:
-            graph = prev_graph
-        for face in body.faces:
-            if face is not None:
-                face_data = self.get_face_data(face)
-                graph["nodes"].append(face_data)
-        for edge in body.edges:
-            if edge is not None:
-                edge_data = self.get_edge_data(edge)
-                graph["links"].append(edge_data)
+            nodes = prev_graph["nodes"] + nodes
+            links = prev_graph["links"] + links
+        graph["nodes"] = nodes
+        graph["links"] = links
         return graph
 
     def get_graph_from_bodies(self, bodies):
         """Get a graph from a set of bodies
-            without using any cache data"""
+            without reusing graph data from previous graphs"""
         graph = self.get_empty_graph()
         for body in bodies:
-            for face in body.faces:
-                if face is not None:
-                    face_data = self.get_face_data(face)
-                    graph["nodes"].append(face_data)
-        for body in bodies:
-            for edge in body.edges:
-                if edge is not None:
-                    edge_data = self.get_edge_data(edge)
-                    graph["links"].append(edge_data)
+            nodes, links = self.get_body_graph_data(body)
+            graph["nodes"].extend(nodes)
+            graph["links"].extend(links)
         return graph
 
-    def get_face_data(self, face):
+    def get_body_graph_data(self, body, use_entity_cache=True):
+        """Get the graph nodes and links for the faces and edges of a body"""
+        # Face normals are cached while building the nodes
+        # so the links can reuse them, tempIds are only unique
+        # within a body so the cache is only kept for this body
+        self.face_normal_cache = {}
+        self.face_pair_perpendicular_cache = {}
+        # Reuse the entities and uuids from the edge cache update
+        # if the body is unchanged and the marker hasn't moved since
+        body_entities = None
+        if use_entity_cache:
+            body_entities = self.body_entity_cache.get(body.revisionId)
+        if body_entities is None:
+            body_entities = (body.faces, body.edges, None, None)
+        faces, edges, face_uuids, edge_uuids = body_entities
+        # B-Rep face and edge collections never contain None
+        nodes = [self.get_face_data(face, face_uuids) for face in faces]
+        links = [self.get_edge_data(edge, edge_uuids) for edge in edges]
+        self.face_normal_cache = {}
+        self.face_pair_perpendicular_cache = {}
+        return nodes, links
+
+    def get_face_data(self, face, face_uuids=None):
         """Get the features for a face"""
-        face_uuid = self.get_regraph_uuid(face)
+        if face_uuids is None:
+            face_uuid = self.get_regraph_uuid(face)
+        else:
+            face_uuid = self.get_face_uuid_from_map(face, face_uuids)
         assert face_uuid is not None
         face_metadata = None
         if self.include_labels:
             face_metadata = self.face_cache[face_uuid]
-        if self.mode == "PerExtrude":
-            return self.get_face_data_per_extrude(face, face_uuid, face_metadata)
-        elif self.mode == "PerFace":
-            return self.get_face_data_per_face(face, face_uuid, face_metadata)
+        return self.face_data_fn(face, face_uuid, face_metadata)
 
     def get_common_face_data(self, face, face_uuid):
         """Get common edge data"""
@@ -671,11 +834,7 @@ class Regraph():
 
     def get_face_labels(self, face_metadata):
         """Get the face labels"""
-        face_data = {}
-        face_data["location_in_feature_label"] = face_metadata["location_in_feature_label"]
-        face_data["timeline_index_label"] = face_metadata["timeline_index_label"]
-        face_data["operation_label"] = face_metadata["operation_label"]
-        return face_data
+        return dict(face_metadata._asdict())
 
     def get_face_data_per_extrude(self, face, face_uuid, face_metadata=None):
         """Get the features for a face for a per extrude graph"""
@@ -697,15 +856,16 @@ class Regraph():
             face_data.update(face_labels)
         return face_data
 
-    def get_edge_data(self, edge):
+    def get_edge_data(self, edge, edge_uuids=None):
         """Get the features for an edge"""
-        edge_uuid = self.get_regraph_uuid(edge)
+        edge_uuid = None
+        if edge_uuids is not None:
+            edge_uuid = edge_uuids.get(edge.tempId)
+        if edge_uuid is None:
+            edge_uuid = self.get_regraph_uuid(edge)
         assert edge_uuid is not None
         edge_metadata = self.edge_cache[edge_uuid]
-        if self.mode == "PerExtrude":
-            return self.get_edge_data_per_extrude(edge, edge_uuid, edge_metadata)
-        elif self.mode == "PerFace":
-            return self.get_edge_data_per_face(edge, edge_uuid, edge_metadata)
+        return self.edge_data_fn(edge, edge_uuid, edge_metadata)
 
     def get_common_edge_data(self, edge_uuid, edge_metadata):
         """Get common edge data"""
@@ -740,10 +900,12 @@ class Regraph():
 
     def get_extrude_sketch_profile(self, extrude):
         """Get the sketch referenced from an extrude"""
-        if isinstance(extrude.profile, adsk.fusion.Profile):
-            return extrude.profile.parentSketch, extrude.profile
-        elif isinstance(extrude.profile, adsk.core.ObjectCollection):
-            return extrude.profile[0].parentSketch, extrude.profile[0]
+        extrude_profile = extrude.profile
+        if isinstance(extrude_profile, adsk.fusion.Profile):
+            return extrude_profile.parentSketch, extrude_profile
+        elif isinstance(extrude_profile, adsk.core.ObjectCollection):
+            profile = extrude_profile[0]
+            return profile.parentSketch, profile
         else:
             raise Exception("Extrude sketch profile error")
 
@@ -756,11 +918,11 @@ class Regraph():
 
     def offset_point_by_distance(self, point, vector, distance):
         """Offset a point along a vector by a given distance"""
-        point_vector = point.asVector()
-        scale_vector = vector.copy()
-        scale_vector.scaleBy(distance)
-        point_vector.add(scale_vector)
-        return point_vector.asPoint()
+        return adsk.core.Point3D.create(
+            point.x + vector.x * distance,
+            point.y + vector.y * distance,
+            point.z + vector.z * distance
+        )
 
     def get_extrude_distance(self, extrude):
         """Get the extrude distance"""
@@ -773,47 +935,66 @@ class Regraph():
     def get_extrude_offset(self, extrude):
         """Get any offset from the sketch plane to the extrude"""
         start_extent = extrude.startExtent
-        if isinstance(start_extent, adsk.fusion.ProfilePlaneStartDefinition):
+        offset_fn = self.get_start_extent_offset_fn(start_extent)
+        if offset_fn is None:
             return 0
-        elif isinstance(start_extent, adsk.fusion.OffsetStartDefinition):
-            offset = start_extent.offset
-            # If the ProfilePlaneWithOffsetDefinition is
-            # associated with an existing feature
-            if isinstance(offset, adsk.fusion.ModelParameter):
-                return offset.value
-            # If the ProfilePlaneWithOffsetDefinition object was created statically
-            # and is not associated with a feature
-            elif isinstance(offset, adsk.core.ValueInput):
-                if offset.valueType == adsk.fusion.ValueTypes.RealValueType:
-                    return offset.realValue
-                elif value_input.valueType == adsk.fusion.ValueTypes.StringValueType:
-                    return float(offset.stringValue)
+        return offset_fn(start_extent)
+
+    def get_start_extent_offset_fn(self, start_extent):
+        """Get the function to find the offset of a start extent"""
+        offset_fn = self.start_extent_offset_fns.get(type(start_extent))
+        if offset_fn is None:
+            # Fall back to isinstance checks in case
+            # we were given a subclass of the start extent
+            for extent_type, extent_offset_fn in self.start_extent_offset_fns.items():
+                if isinstance(start_extent, extent_type):
+                    return extent_offset_fn
+        return offset_fn
+
+    def get_offset_start_extent_offset(self, start_extent):
+        """Get the offset from an offset start extent"""
+        offset = start_extent.offset
+        # If the ProfilePlaneWithOffsetDefinition is
+        # associated with an existing feature
+        if isinstance(offset, adsk.fusion.ModelParameter):
+            return offset.value
+        # If the ProfilePlaneWithOffsetDefinition object was created statically
+        # and is not associated with a feature
+        elif isinstance(offset, adsk.core.ValueInput):
+            if offset.valueType == adsk.core.ValueTypes.RealValueType:
+                return offset.realValue
+            elif offset.valueType == adsk.core.ValueTypes.StringValueType:
+                return float(offset.stringValue)
         return 0
 
     def get_coplanar_face(self, plane, body):
         """Find a face on the same body that is coplanar to the given plane"""
         # for body in self.reconstruction.bRepBodies:
-        for face in body.faces:
-            if isinstance(face.geometry, adsk.core.Plane):
-                is_coplanar = plane.isCoPlanarTo(face.geometry)
-                if is_coplanar:
-                    return face
-        return None
+        face_geometries = ((face, face.geometry) for face in body.faces)
+        return next((
+            face for face, face_geometry in face_geometries
+            if isinstance(face_geometry, adsk.core.Plane) and
+            plane.isCoPlanarTo(face_geometry)
+        ), None)
 
     def get_regraph_uuid(self, entity):
         """Get a uuid or a tempid depending on a flag"""
-        is_face = isinstance(entity, adsk.fusion.BRepFace)
-        is_edge = isinstance(entity, adsk.fusion.BRepEdge)
-        if self.use_temp_id and (is_face or is_edge):
+        if self.use_temp_id and isinstance(entity, TEMP_ID_TYPES):
             return str(entity.tempId)
         else:
             return name.get_uuid(entity)
 
+    def get_face_uuid_from_map(self, face, face_uuids):
+        """Get a face uuid from a tempId map, falling back
+            to a regular lookup if the face is missing"""
+        face_uuid = face_uuids.get(face.tempId)
+        if face_uuid is None:
+            face_uuid = self.get_regraph_uuid(face)
+        return face_uuid
+
     def set_regraph_uuid(self, entity):
         """Set a uuid or a tempid depending on a flag"""
-        is_face = isinstance(entity, adsk.fusion.BRepFace)
-        is_edge = isinstance(entity, adsk.fusion.BRepEdge)
-        if self.use_temp_id and (is_face or is_edge):
+        if self.use_temp_id and isinstance(entity, TEMP_ID_TYPES):
             return str(entity.tempId)
         else:
             return name.set_uuid(entity)
@@ -922,7 +1103,8 @@ class RegraphWriter():
 
 
 class RegraphTester(unittest.TestCase):
-    """Reconstruction Graph tester to check for invalid data"""
+    """Reconstruction Graph tester to check for invalid data
+        Validation is skipped when Python runs with -O"""
 
     def __init__(self, mode="PerExtrude"):
         self.mode = mode
@@ -930,6 +1112,9 @@ class RegraphTester(unittest.TestCase):
 
     def test(self, graph_data):
         """Test the graph data structure returned by regraph"""
+        # Like assert statements, skip validation when optimized
+        if not __debug__:
+            return
         if self.mode == "PerExtrude":
             for graph in graph_data["graphs"]:
                 self.test_per_extrude_graph(graph)
@@ -945,6 +1130,8 @@ class RegraphTester(unittest.TestCase):
 
     def reconstruct(self, graph_data, target):
         """Reconstruct and test it matches the target"""
+        if not __debug__:
+            return
         # We create another temporary test component
         # to perform reconstruction in
         app = adsk.core.Application.get()
@@ -973,19 +1160,11 @@ class RegraphTester(unittest.TestCase):
         self.assertIn("links", graph, msg="Graph has links")
         self.assertGreaterEqual(len(graph["nodes"]), 3, msg="Graph nodes >= 3")
         self.assertGreaterEqual(len(graph["links"]), 2, msg="Graph links >= 2")
-        node_set = set()
-        node_list = []
-        for node in graph["nodes"]:
-            self.assertIn("id", node, msg="Graph node has id")
-            node_set.add(node["id"])
-            node_list.append(node["id"])
-        self.assertEqual(len(node_set), len(node_list), msg="Graph nodes are unique")
-        for link in graph["links"]:
-            self.assertIn("id", link, msg="Graph link has id")
-            self.assertIn("source", link, msg="Graph link has source")
-            self.assertIn(link["source"], node_set, msg="Graph link source in node set")
-            self.assertIn("target", link, msg="Graph link has target")
-            self.assertIn(link["target"], node_set, msg="Graph link target in node set")
+        self.assertTrue(all("id" in node for node in graph["nodes"]), msg="Graph node has id")
+        node_ids = [node["id"] for node in graph["nodes"]]
+        node_set = set(node_ids)
+        self.assertEqual(len(node_set), len(node_ids), msg="Graph nodes are unique")
+        self.test_graph_links(graph["links"], node_set)
 
     def test_per_face_graph(self, graph):
         """Test a per face graph"""
@@ -997,46 +1176,54 @@ class RegraphTester(unittest.TestCase):
         self.assertIsInstance(graph["links"], list, msg="Links is list")
         self.assertGreaterEqual(len(graph["nodes"]), 3, msg="Graph nodes >= 3")
         self.assertGreaterEqual(len(graph["links"]), 2, msg="Graph links >= 3")
-        node_set = set()
-        node_list = []
-        for node in graph["nodes"]:
-            self.assertIn("id", node, msg="Graph node has id")
-            node_set.add(node["id"])
-            node_list.append(node["id"])
-        self.assertEqual(len(node_set), len(node_list), msg="Graph nodes are unique")
-        link_set = set()
-        for link in graph["links"]:
-            self.assertIn("id", link, msg="Graph link has id")
-            link_set.add(link["id"])
-            # Check that the edges refer to existing faces
-            self.assertIn("source", link, msg="Graph link has source")
-            self.assertIn(link["source"], node_set, msg="Graph link source in node set")
-            self.assertIn("target", link, msg="Graph link has target")
-            self.assertIn(link["target"], node_set, msg="Graph link target in node set")
+        self.assertTrue(all("id" in node for node in graph["nodes"]), msg="Graph node has id")
+        node_ids = [node["id"] for node in graph["nodes"]]
+        node_set = set(node_ids)
+        self.assertEqual(len(node_set), len(node_ids), msg="Graph nodes are unique")
+        self.test_graph_links(graph["links"], node_set)
+        link_set = {link["id"] for link in graph["links"]}
         return node_set, link_set
 
+    def test_graph_links(self, links, node_set):
+        """Test that the graph links have ids and refer to existing nodes"""
+        self.assertTrue(all("id" in link for link in links), msg="Graph link has id")
+        self.assertTrue(all("source" in link for link in links), msg="Graph link has source")
+        self.assertTrue(all("target" in link for link in links), msg="Graph link has target")
+        # Check that the edges refer to existing faces
+        self.assertTrue(
+            node_set.issuperset(link["source"] for link in links),
+            msg="Graph link source in node set"
+        )
+        self.assertTrue(
+            node_set.issuperset(link["target"] for link in links),
+            msg="Graph link target in node set"
+        )
+
     def test_per_face_sequence(self, sequence, node_set, link_set):
         # Sequence
         self.assertIsNotNone(sequence, msg="Sequence is not None")
         self.assertIn("sequence", sequence, msg="Sequence has sequence")
-        self.assertGreaterEqual(len(sequence["sequence"]), 1, msg="Sequence length >= 1")
-        valid_extrudes = [
-            "JoinFeatureOperation",
-            "CutFeatureOperation",
-            "IntersectFeatureOperation",
-            "NewBodyFeatureOperation"
-        ]
-        for seq in sequence["sequence"]:
-            # Check that the faces are in the target
-            self.assertIn("start_face", seq, msg="Sequence element has start_face")
-            self.assertIn(seq["start_face"], node_set, msg="Start face is in target nodes")
-            self.assertIn("end_face", seq, msg="Sequence element has end_face")
-            self.assertIn(seq["end_face"], node_set, msg="End face is in target nodes")
-            self.assertIn("operation", seq, msg="Sequence element has operation")
-            self.assertIn(seq["operation"], valid_extrudes, msg="Operation is valid")
-            self.assertIn("graph", seq, msg="Sequence element has graph")
-            self.assertIsInstance(seq["graph"], str, msg="Sequence graph is string")
-            self.assertTrue(seq["graph"].endswith(".json"), msg="Sequence ends with .json")
+        seq_list = sequence["sequence"]
+        self.assertGreaterEqual(len(seq_list), 1, msg="Sequence length >= 1")
+        # Check that the faces are in the target
+        self.assertTrue(all("start_face" in seq for seq in seq_list), msg="Sequence element has start_face")
+        self.assertTrue(
+            node_set.issuperset(seq["start_face"] for seq in seq_list),
+            msg="Start face is in target nodes"
+        )
+        self.assertTrue(all("end_face" in seq for seq in seq_list), msg="Sequence element has end_face")
+        self.assertTrue(
+            node_set.issuperset(seq["end_face"] for seq in seq_list),
+            msg="End face is in target nodes"
+        )
+        self.assertTrue(all("operation" in seq for seq in seq_list), msg="Sequence element has operation")
+        self.assertTrue(
+            VALID_EXTRUDE_OPERATIONS.issuperset(seq["operation"] for seq in seq_list),
+            msg="Operation is valid"
+        )
+        self.assertTrue(all("graph" in seq for seq in seq_list), msg="Sequence element has graph")
+        self.assertTrue(all(isinstance(seq["graph"], str) for seq in seq_list), msg="Sequence graph is string")
+        self.assertTrue(all(seq["graph"].endswith(".json") for seq in seq_list), msg="Sequence ends with .json")
 
         # Properties
         self.assertIn("properties", sequence, msg="Sequence has properties")
@@ -1065,62 +1252,38 @@ class RegraphTester(unittest.TestCase):
         )
         gt_bbox = geometry.get_bounding_box(gt)
         rc_bbox = geometry.get_bounding_box(rc)
-        self.assertAlmostEqual(
-            rc_bbox.maxPoint.x,
-            gt_bbox.maxPoint.x,
-            places=places, msg="bounding_box_max_x"
-        )
-        self.assertAlmostEqual(
-            rc_bbox.maxPoint.y,
-            gt_bbox.maxPoint.y,
-            places=places,
-            msg="bounding_box_max_y"
-        )
-        self.assertAlmostEqual(
-            rc_bbox.maxPoint.z,
-            gt_bbox.maxPoint.z,
-            places=places,
-            msg="bounding_box_max_z"
-        )
-        self.assertAlmostEqual(
-            rc_bbox.minPoint.x,
-            gt_bbox.minPoint.x,
-            places=places,
-            msg="bounding_box_min_x"
-        )
-        self.assertAlmostEqual(
-            rc_bbox.minPoint.y,
-            gt_bbox.minPoint.y,
-            places=places,
-            msg="bounding_box_min_y"
-        )
-        self.assertAlmostEqual(
-            rc_bbox.minPoint.z,
-            gt_bbox.minPoint.z,
-            places=places,
-            msg="bounding_box_min_z"
-        )
-        self.assertFalse(
-            math.isinf(rc_bbox.maxPoint.x),
-            msg="bounding_box_max_x != inf"
-        )
-        self.assertFalse(
-            math.isinf(rc_bbox.maxPoint.y),
-            msg="bounding_box_max_y != inf"
-        )
-        self.assertFalse(
-            math.isinf(rc_bbox.maxPoint.z),
-            msg="bounding_box_max_z != inf"
-        )
-        self.assertFalse(
-            math.isinf(rc_bbox.minPoint.x),
-            msg="bounding_box_min_x != inf"
-        )
-        self.assertFalse(
-            math.isinf(rc_bbox.minPoint.y),
-            msg="bounding_box_min_y != inf"
-        )
-        self.assertFalse(
-            math.isinf(rc_bbox.minPoint.z),
-            msg="bounding_box_min_z != inf"
+        # Compare all the bounding box values at once
+        # using the same rounding as assertAlmostEqual
+        gt_values = self.get_bounding_box_values(gt_bbox)
+        rc_values = self.get_bounding_box_values(rc_bbox)
+        not_equal = [
+            key for key in rc_values
+            if not self.is_almost_equal(rc_values[key], gt_values[key], places)
+        ]
+        self.assertEqual(
+            not_equal, [],
+            msg=f"bounding_box values equal\nrc: {rc_values}\ngt: {gt_values}"
         )
+        infinite = [key for key, value in rc_values.items() if math.isinf(value)]
+        self.assertEqual(infinite, [], msg="bounding_box values != inf")
+
+    def get_bounding_box_values(self, bbox):
+        """Get the bounding box min and max values by name"""
+        return {
+            "bounding_box_max_x": bbox.maxPoint.x,
+            "bounding_box_max_y": bbox.maxPoint.y,
+            "bounding_box_max_z": bbox.maxPoint.z,
+            "bounding_box_min_x": bbox.minPoint.x,
+            "bounding_box_min_y": bbox.minPoint.y,
+            "bounding_box_min_z": bbox.minPoint.z
+        }
+
+    def is_almost_equal(self, first, second, places):
+        """Check if two values are equal after rounding
+            the difference, matching assertAlmostEqual"""
+        if first == second:
+            return True
+        diff = first - second
+        if not math.isfinite(diff):
+            return False
+        return round(diff, places) == 0
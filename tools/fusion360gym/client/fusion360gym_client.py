@@ -435,12 +435,9 @@ class Fusion360GymClient():
                 if entity_index == 0:
                     entity_uuid = timeline_object["entity"]
                     entity = entities[entity_uuid]
-                    if entity["reference_plane"]["name"] == "XY":
-                        plane_counts["XY"] += 1
-                    elif entity["reference_plane"]["name"] == "XZ":
-                        plane_counts["XZ"] += 1
-                    elif entity["reference_plane"]["name"] == "YZ":
-                        plane_counts["YZ"] += 1
+                    plane_name = entity["reference_plane"]["name"]
+                    if plane_name in plane_counts:
+                        plane_counts[plane_name] += 1
             # get extrusion counts
             sequences = data["sequence"]
             extrude_count = 0
@@ -547,15 +544,12 @@ class Fusion360GymClient():
            not sampling_type == "distributive":
             return self.__return_error("Invalid sampling type")
         if sampling_type == "random":
-            return np.random.choice(sketches, 1)[0]
+            return random.choice(sketches)
         elif sampling_type == "deterministic":
             max_area = 0
             returned_sketch = None
             for sketch in sketches:
-                sketch_area = 0
-                profiles = sketch["profiles"]
-                for profile in profiles:
-                    sketch_area += profiles[profile]["properties"]["area"]
+                sketch_area = self.__get_sketch_area(sketch)
                 if sketch_area > max_area:
                     max_area = sketch_area
                     returned_sketch = sketch
@@ -568,12 +562,9 @@ class Fusion360GymClient():
             area_difference = 1e6
             returned_sketch = None
             for sketch in sketches:
-                sketch_area = 0
-                profiles = sketch["profiles"]
-                for profile in profiles:
-                    sketch_area += profiles[profile]["properties"]["area"]
-                if abs(sketch_area - sampled_area) < area_difference:
-                    area_difference = abs(sketch_area - sampled_area)
+                sketch_area_difference = abs(self.__get_sketch_area(sketch) - sampled_area)
+                if sketch_area_difference < area_difference:
+                    area_difference = sketch_area_difference
                     returned_sketch = sketch
             return returned_sketch
 
@@ -595,7 +586,7 @@ class Fusion360GymClient():
             return self.__return_error("Invalid sampling type")
         if sampling_type == "random":
             profile_objects = list(profiles.values())
-            return np.random.choice(profile_objects, num_sampled_profiles).tolist()
+            return random.choices(profile_objects, k=num_sampled_profiles)
         elif sampling_type == "deterministic":
             # calculate average area of profiles
             average_area = 0
@@ -694,6 +685,10 @@ class Fusion360GymClient():
                 sketches.append(entity)
         return None if len(sketches) == 0 else sketches
 
+    def __get_sketch_area(self, sketch):
+        """get the total area of the profiles in a sketch"""
+        return sum(profile["properties"]["area"] for profile in sketch["profiles"].values())
+
     # -------------------------------------------------------------------------
     # EXPORT
     # -------------------------------------------------------------------------
@@ -80,8 +80,7 @@ def get_output_dir():
         output_dir = Path(args.output)
     else:
         output_dir = Path(__file__).resolve().parent / "log"
-    if not output_dir.exists():
-        output_dir.mkdir(parents=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
     return output_dir
 
 
@@ -183,11 +182,11 @@ def main():
             print("-------------------------")
             print(f"[{files_processed + 1}/{len(files)} files] Reconstructing {file.stem}")
             try:
-                start_time = time.time()
+                start_time = time.monotonic()
                 target_graph, bounding_box = search.set_target(file)
                 agent.set_target(target_graph, bounding_box)
                 best_score_over_time = search.search(agent, args.budget, screenshot=args.screenshot)
-                time_taken = time.time() - start_time
+                time_taken = time.monotonic() - start_time
                 print(f"---> Score: {best_score_over_time[-1]:.3f} in {len(best_score_over_time)}/{args.budget} steps ({time_taken:.2f} sec)")
                 files_processed += 1
             except ConnectionError as ex: